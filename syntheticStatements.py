@@ -0,0 +1,807 @@
+import sys
+import argparse
+import random
+import tempfile
+import time
+import zlib
+import pandas as pd
+from decimal import Decimal
+from pathlib import Path
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import bankDetailsExtract as bde
+
+
+# ==================================================
+# Synthetic statements (scaling / load tests)
+# ==================================================
+# Generates statements of any page count for every layout in
+# bankDetailsExtract.LAYOUT_PARSERS, drawn with the text, section headings and
+# column positions those parsers expect, together with the ground-truth rows.
+# Nothing here comes from a real statement; names, accounts and amounts are random.
+#
+#   python syntheticStatements.py generate --layout bmo_new --pages 100 --out input/synthetic
+#   python syntheticStatements.py bench --pages 10 100 1000 [--csv bench.csv]
+#   python syntheticStatements.py fixtures --out fixtures
+
+LAYOUTS = ["wf_optimize", "wf_combined", "wf_business_card", "bmo_old", "bmo_new",
+           "bmo_creditcard", "bofa", "chase_credit"]
+TRUTH_COLUMNS = ["date", "description", "debit", "credit", "balance", "account_name", "account_number"]
+BENCH_PAGES = [10, 100, 1000]
+SUPERLINEAR_RATIO = 1.5   # seconds/page at the largest size vs the smallest before we flag it
+# Layouts no statement in input/ pins in fixtures/ (sample4's BofA text layer is
+# garbled); wf_combined's template has two accounts, so the account split is covered
+FIXTURE_LAYOUTS = ["bofa", "bmo_creditcard", "wf_business_card", "wf_combined"]
+FIXTURE_PAGES = 3
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792   # US letter, points
+TOP, BOTTOM, LEADING = 740, 56, 11
+FONT_SIZE = 8
+
+
+# ==================================================
+# Minimal PDF writer
+# ==================================================
+class MiniPdf:
+    """
+    Just enough PDF for the parsers: Helvetica / Helvetica-Bold text placed at
+    absolute positions, one Flate-compressed content stream per page.
+    The standard-14 fonts need no embedding; pdfminer has their metrics.
+    """
+
+    FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+    def __init__(self, width=PAGE_WIDTH, height=PAGE_HEIGHT):
+        self.width, self.height = width, height
+        self.pages = []   # compressed content streams
+
+    @staticmethod
+    def _escape(text):
+        raw = str(text).encode("cp1252", "replace")
+        return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def add_page(self, cells):
+        """cells: iterable of (x, y, text, size, bold); y is measured from the bottom."""
+        ops = []
+        for x, y, text, size, bold in cells:
+            ops.append(b"BT /%s %g Tf 1 0 0 1 %.2f %.2f Tm (%s) Tj ET" % (
+                b"F2" if bold else b"F1", size, x, y, self._escape(text)))
+        self.pages.append(zlib.compress(b"\n".join(ops)))
+
+    def to_bytes(self):
+        n_fonts = len(self.FONTS)
+        first_page = 3 + n_fonts
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                b" ".join(b"%d 0 R" % (first_page + 2 * i) for i in range(len(self.pages))),
+                len(self.pages)),
+        ]
+        font_refs = []
+        for i, (name, base) in enumerate(self.FONTS.items()):
+            objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+                           % base.encode())
+            font_refs.append(b"/%s %d 0 R" % (name.encode(), 3 + i))
+        for i, stream in enumerate(self.pages):
+            objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                           b"/Resources << /Font << %s >> >> /Contents %d 0 R >>"
+                           % (self.width, self.height, b" ".join(font_refs), first_page + 2 * i + 1))
+            objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+                           % (len(stream), stream))
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for num, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+
+class PageLayout:
+    """
+    Lays text lines out top-down over as many pages as needed and tracks how much
+    of the target page budget is used. Templates call line(); `continued` (set by
+    the template as it enters a section) draws the heading repeated at the top of
+    each new page, `footer(page_no, pages)` the furniture at the bottom.
+    """
+
+    lines_per_page = int((TOP - BOTTOM) / LEADING)
+
+    def __init__(self, target_pages, footer=None):
+        self.target_pages = max(1, int(target_pages))
+        self.footer = footer
+        self.continued = None
+        self._pages = []
+        self._cells = None
+        self.y = None
+
+    def _new_page(self):
+        if self._cells is not None:
+            self._pages.append(self._cells)
+        self._cells, self.y = [], TOP
+        if self.continued and self._pages:
+            self.continued()
+
+    def line(self, *cells, bold=False, size=FONT_SIZE):
+        """Draw one text line; cells are (x, text) pairs sharing the same baseline."""
+        if self._cells is None or self.y < BOTTOM:
+            self._new_page()
+        for x, text in cells:
+            if text not in (None, ""):
+                self._cells.append((x, self.y, text, size, bold))
+        self.y -= LEADING
+
+    def keep_together(self, lines):
+        """Start a new page unless `lines` more lines fit (a wrapped row never splits)."""
+        if self._cells is not None and self.y - LEADING * (lines - 1) < BOTTOM:
+            self._new_page()
+
+    def skip(self, lines=1):
+        self.y -= LEADING * lines
+
+    @property
+    def pages_used(self):
+        return len(self._pages) + (self._cells is not None)
+
+    def progress(self):
+        """Fraction of the target page budget used so far."""
+        if self._cells is None:
+            return 0.0
+        done = len(self._pages) + (TOP - self.y) / (TOP - BOTTOM)
+        return done / self.target_pages
+
+    def full(self, reserve_lines=0):
+        """True once the last target page has fewer than reserve_lines left."""
+        return self.progress() >= 1 - reserve_lines / (self.lines_per_page * self.target_pages)
+
+    def to_pdf(self):
+        pages = self._pages + ([self._cells] if self._cells is not None else [])
+        pdf = MiniPdf()
+        for i, cells in enumerate(pages, start=1):
+            if self.footer:
+                cells = cells + [(x, y, text, FONT_SIZE, False) for x, y, text in self.footer(i, len(pages))]
+            pdf.add_page(cells)
+        return pdf.to_bytes()
+
+
+# ==================================================
+# Random content
+# ==================================================
+PERIOD_START = date(2025, 7, 1)
+PERIOD_DAYS = 31
+
+_MERCHANTS = [
+    "Costco Whse #0123 Ontario CA", "Amazon Mktpl*Rt4Kd2 Seattle WA", "Shell Oil 57442 Fontana CA",
+    "Home Depot #6612 Riverside CA", "Staples 00115 Chino CA", "Uline Ship Supplies",
+    "Adobe *Creative Cloud", "Google *Gsuite Business", "Fedex 8827361 Memphis TN",
+    "Pilot Travel Ctr 0412", "Office Depot 1127", "Verizon Wrls Payment", "Sysco Foods Riverside",
+    "Grainger 8834 Industrial", "Dell Marketing LP", "Comcast Business 8155",
+]
+_DEBIT_PREFIXES = [
+    "Purchase authorized on {md}", "Recurring Payment authorized on {md}",
+    "ACH Debit", "Business to Business ACH Debit -",
+]
+_CREDIT_DESCS = [
+    "eDeposit in Branch/Store {md} 4105 Main St", "Online Transfer From Business Savings Ref #IB0{ref}",
+    "Hrtland Pmt Sys Txns/Fees 650000{ref}", "WT Fed#{ref} Incoming Wire Acme Logistics",
+    "Deposit Made In A Branch/Store", "Wells Fargo Rewards Cash Back",
+]
+_BMO_DEBITS = ["ACH DEBIT", "PC TRANSFER DEBIT", "DEBIT CARD PURCHASE", "ONLINE BILL PAYMENT"]
+_BMO_CREDITS = ["ACH CREDIT", "INCOMING WIRE", "PC TRANSFER CREDIT", "DEPOSIT"]
+_BMO_DETAILS = ["CCD ALLY ALLY PAYMT", "PPD LEASE SERVICES BILLPAY", "CCD Servicehqtrs AUTH PAYME",
+                "FED WIRE TRANSFER CREDIT", "PPD CULLIGAN OF ONTA", "CCD PAYROLL SVC"]
+
+
+def _ref(rng, n=6):
+    return "".join(rng.choice("0123456789") for _ in range(n))
+
+
+def _amount(rng, lo=5, hi=2500):
+    return Decimal(rng.randint(lo * 100, hi * 100)) / 100
+
+
+def _money(value, dollar=False):
+    sign = "-" if value < 0 else ""
+    return f"{sign}{'$' if dollar else ''}{abs(value):,.2f}"
+
+
+def _day(fraction):
+    """Statement date for a point `fraction` (0..1) of the way through the statement."""
+    return PERIOD_START + timedelta(days=min(PERIOD_DAYS - 1, int(max(fraction, 0) * PERIOD_DAYS)))
+
+
+def _truth(day, description, debit=None, credit=None, balance=None, **extra):
+    return {"date": day.isoformat() if day else None, "description": description,
+            "debit": debit, "credit": credit, "balance": balance, **extra}
+
+
+def _wf_debit_desc(rng, day):
+    return f"{rng.choice(_DEBIT_PREFIXES).format(md=day.strftime('%m/%d'))} {rng.choice(_MERCHANTS)}"
+
+
+def _wf_credit_desc(rng, day):
+    return rng.choice(_CREDIT_DESCS).format(md=day.strftime("%m/%d"), ref=_ref(rng))
+
+
+def _wrap(text, width):
+    """Split text into lines of at most `width` characters (on spaces)."""
+    lines, cur = [], ""
+    for word in text.split():
+        if cur and len(cur) + 1 + len(word) > width:
+            lines.append(cur)
+            cur = word
+        else:
+            cur = f"{cur} {word}".strip()
+    return lines + ([cur] if cur else [])
+
+
+def _page_of(x=40, prefix="Page "):
+    return lambda page, pages: [(x, 36, f"{prefix}{page} of {pages}")]
+
+
+# ==================================================
+# Templates: one per layout, each returns (PageLayout, truth rows)
+# ==================================================
+def _tpl_wf_optimize(rng, pages):
+    """Wells Fargo Optimize Business Checking: inline credit/debit ledgers, 1-2 dates per row."""
+    account = _ref(rng, 10)
+    doc = PageLayout(pages, footer=lambda p, n: [(40, 44, f"Sheet Seq = 00{_ref(rng, 5)}"),
+                                                 (480, 36, f"Page {p} of {n}")])
+    doc.line((40, "Optimize Business Checking SM"), bold=True)
+    doc.line((40, f"Account number: {account}"), (300, "July 1, 2025 - July 31, 2025"))
+    doc.line((40, "Questions? Available by phone 24 hours a day, 7 days a week"))
+    doc.skip()
+    doc.line((40, "Transaction history"), bold=True)
+    truth = []
+
+    def section(title, credit, until):
+        def heading(cont=""):
+            doc.line((40, f"{title}{cont}"), bold=True)
+            doc.line((40, "Effective"), (80, "Posted"))
+            doc.line((40, "date"), (80, "date"), (130, "Amount"), (200, "Transaction detail"))
+        heading()
+        doc.continued = lambda: (doc.line((40, f"Account number: {account}"), (300, "July 1, 2025 - July 31, 2025")),
+                                 heading(" (continued)"))
+        total = Decimal(0)
+        while doc.progress() < until and not doc.full(22):  # room for the totals and the ledger summary
+            day = _day(doc.progress())
+            amt = _amount(rng, 10, 25000)
+            desc = _wf_credit_desc(rng, day) if credit else _wf_debit_desc(rng, day)
+            if not credit and rng.random() < 0.3:
+                desc += f" S38{_ref(rng, 12)} Card 9026"
+            parts = _wrap(desc, 62)
+            effective = day - timedelta(days=rng.randint(0, 2)) if not credit else None
+            doc.keep_together(len(parts))
+            doc.line((40, effective.strftime("%m/%d") if effective else ""), (80, day.strftime("%m/%d")),
+                     (130, _money(amt)), (200, parts[0]))
+            for part in parts[1:]:
+                doc.line((200, part))
+            truth.append(_truth(day, " ".join(parts), credit=amt if credit else None,
+                                debit=None if credit else amt))
+            total += amt
+        doc.continued = None
+        doc.line((130, _money(total, dollar=True)), (200, f"Total {title.lower()}"), bold=True)
+
+    section("Electronic deposits/bank credits", True, 0.45)
+    section("Electronic debits/bank debits", False, 1.0)
+    doc.skip()
+    doc.line((40, "Daily ledger balance summary"), bold=True)
+    doc.line((40, "Date"), (100, "Balance"), (200, "Date"), (260, "Balance"))
+    balance = _amount(rng, 1000, 90000)
+    for i in range(0, PERIOD_DAYS, 2):
+        if doc.full(2):
+            break
+        d1, d2 = PERIOD_START + timedelta(days=i), PERIOD_START + timedelta(days=i + 1)
+        doc.line((40, d1.strftime("%m/%d")), (100, _money(balance)),
+                 (200, d2.strftime("%m/%d")), (260, _money(balance + 125)))
+    return doc, truth
+
+
+def _tpl_wf_combined(rng, pages):
+    """Wells Fargo Combined Statement: per-account "Transaction history" tables with daily balances."""
+    doc = PageLayout(pages, footer=_page_of(480))
+    doc.line((40, "Combined Statement of Accounts"), bold=True)
+    doc.line((40, "July 1, 2025 - July 31, 2025"))
+    doc.skip()
+    truth = []
+
+    def table_header():
+        doc.line((40, "Date"), (70, "Check Number"), (130, "Description"), (340, "Deposits/ Credits"),
+                 (420, "Withdrawals/ Debits"), (500, "Ending daily balance"))
+
+    def account(name, number, until, credit_share):
+        doc.line((40, name), bold=True)
+        doc.line((40, f"Account number: {number}"))
+        doc.line((40, "Transaction history"), bold=True)
+        table_header()
+        doc.continued = lambda: (doc.line((40, "Transaction history (continued)"), bold=True), table_header())
+        balance = _amount(rng, 5000, 60000)
+        while doc.progress() < until and not doc.full(10):
+            # one day's rows; the ending daily balance is printed on its last row
+            day = _day(doc.progress())
+            n = rng.randint(1, 4)
+            for i in range(n):
+                credit = rng.random() < credit_share
+                amt = _amount(rng, 5, 9000)
+                balance += amt if credit else -amt
+                parts = _wrap(_wf_credit_desc(rng, day) if credit else _wf_debit_desc(rng, day), 44)
+                last = i == n - 1
+                doc.keep_together(len(parts))
+                doc.line((40, f"{day.month}/{day.day}"), (130, parts[0]),
+                         (340 if credit else 420, _money(amt)), (500, _money(balance) if last else ""))
+                for part in parts[1:]:
+                    doc.line((130, part))
+                truth.append(_truth(day, " ".join(parts), credit=amt if credit else None,
+                                    debit=None if credit else amt, balance=balance if last else None,
+                                    account_name=name, account_number=number))
+        doc.continued = None
+        last_day = _day(doc.progress())
+        doc.line((40, f"Ending balance on {last_day.month}/{last_day.day}"), (500, _money(balance)))
+        doc.line((40, "Totals"), (340, "$0.00"), (420, "$0.00"))
+        doc.skip()
+
+    account("Navigate Business Checking", _ref(rng, 10), 0.75, 0.4)
+    account("Business Market Rate Savings", _ref(rng, 10), 1.0, 0.5)
+    return doc, truth
+
+
+def _tpl_wf_business_card(rng, pages):
+    """Wells Fargo Business Card: "Trans Post Description ... Amount" lines, payments as credits."""
+    doc = PageLayout(pages, footer=_page_of(480))
+    doc.line((40, "WELLS FARGO BUSINESS CARD"), bold=True)
+    doc.line((40, "Prepared For ACME LOGISTICS LLC"))
+    doc.line((40, f"Account Number Ending in {_ref(rng, 4)}"))
+    doc.line((40, "Statement Period 07/01/2025 to 07/31/2025"))
+    doc.skip()
+
+    def header():
+        doc.line((40, "Trans"), (75, "Post"), (110, "Description"), (420, "Credits"), (490, "Charges"))
+    header()
+    doc.continued = header
+    truth = []
+    while not doc.full(2):
+        day = _day(doc.progress())
+        post = day + timedelta(days=rng.randint(0, 2))
+        if rng.random() < 0.05:
+            desc, amt, credit = "PAYMENT - THANK YOU", _amount(rng, 500, 5000), True
+        else:
+            desc, amt, credit = rng.choice(_MERCHANTS).upper(), _amount(rng, 3, 1500), False
+        doc.line((40, day.strftime("%m/%d")), (75, post.strftime("%m/%d")), (110, desc),
+                 (420 if credit else 490, _money(amt)))
+        truth.append(_truth(day, desc, credit=amt if credit else None, debit=None if credit else amt))
+    return doc, truth
+
+
+def _tpl_chase_credit(rng, pages):
+    """Chase credit card: "MM/DD Merchant ... Amount" with payments negative."""
+    doc = PageLayout(pages, footer=_page_of(480))
+    doc.line((40, "CHASE"), bold=True)
+    doc.line((40, "Credit Card Statement"), bold=True)
+    doc.line((40, "Opening/Closing Date 07/01/25 - 07/31/25"))
+    doc.skip()
+    doc.line((40, "ACCOUNT ACTIVITY"), bold=True)
+    doc.line((40, "Date of Transaction"), (130, "Merchant Name or Transaction Description"), (480, "$ Amount"))
+    doc.continued = lambda: doc.line((40, "ACCOUNT ACTIVITY (CONTINUED)"), bold=True)
+    truth = []
+    while not doc.full(2):
+        day = _day(doc.progress())
+        if rng.random() < 0.05:
+            desc, amt = "Payment Thank You-Mobile", -_amount(rng, 500, 5000)
+        else:
+            desc, amt = rng.choice(_MERCHANTS).upper(), _amount(rng, 3, 1500)
+        doc.line((40, day.strftime("%m/%d")), (130, desc), (480, _money(amt)))
+        truth.append(_truth(day, desc, debit=amt if amt > 0 else None, credit=-amt if amt < 0 else None))
+    return doc, truth
+
+
+def _tpl_bofa(rng, pages):
+    """Bank of America Business Advantage: credits/debits sections and daily ledger balances."""
+    doc = PageLayout(pages, footer=_page_of(480))
+    doc.line((40, "Bank of America Business Advantage Fundamentals Banking"), bold=True)
+    doc.line((40, f"Account number: {_ref(rng, 4)} {_ref(rng, 4)} {_ref(rng, 4)}"))
+    doc.line((40, "for July 1, 2025 to July 31, 2025"))
+    doc.skip()
+    truth = []
+
+    def section(title, credit, until):
+        def heading(cont=""):
+            doc.line((40, f"{title}{cont}"), bold=True)
+            doc.line((40, "Date"), (100, "Description"), (480, "Amount"))
+        heading()
+        doc.continued = lambda: heading(" - continued")
+        total = Decimal(0)
+        while doc.progress() < until and not doc.full(17):  # room for the totals and daily balances
+            day = _day(doc.progress())
+            amt = _amount(rng, 5, 9000)
+            desc = _wf_credit_desc(rng, day) if credit else _wf_debit_desc(rng, day)
+            parts = _wrap(desc.replace("Wells Fargo", "BofA"), 60)
+            doc.keep_together(len(parts))
+            doc.line((40, day.strftime("%m/%d/%y")), (100, parts[0]), (480, _money(amt if credit else -amt)))
+            for part in parts[1:]:
+                doc.line((100, part))
+            truth.append(_truth(day, " ".join(parts), credit=amt if credit else None,
+                                debit=None if credit else amt))
+            total += amt
+        doc.continued = None
+        doc.line((40, f"Total {title.lower()}"), (480, _money(total if credit else -total, dollar=True)))
+        doc.skip()
+
+    section("Deposits and other credits", True, 0.45)
+    section("Withdrawals and other debits", False, 1.0)
+
+    def balances_heading(cont=""):
+        doc.line((40, f"Daily ledger balances{cont}"), bold=True)
+        doc.line((40, "Date"), (90, "Balance ($)"), (200, "Date"), (250, "Balance ($)"),
+                 (360, "Date"), (410, "Balance ($)"))
+    balances_heading()
+    doc.continued = lambda: balances_heading(" - continued")
+    balance = _amount(rng, 2000, 50000)
+    for start in range(0, PERIOD_DAYS, 3):
+        if doc.full(1):
+            break
+        cells = []
+        for col, i in enumerate(range(start, min(start + 3, PERIOD_DAYS))):
+            day = PERIOD_START + timedelta(days=i)
+            balance += _amount(rng, 1, 900)
+            cells += [(40 + 160 * col, day.strftime("%m/%d")), (90 + 160 * col, _money(balance))]
+            truth.append(_truth(day, "Daily Balance", balance=balance))
+        doc.line(*cells)
+    return doc, truth
+
+
+def _tpl_bmo_old(rng, pages):
+    """BMO Business Checking (old style): "Mon DD Amount Description" sections, Daily Balance Summary."""
+    doc = PageLayout(pages, footer=_page_of(480))
+    doc.line((40, "BMO BANK N.A."), bold=True)
+    doc.line((40, f"ACCOUNT NUMBER: {_ref(rng, 10)}"))
+    doc.line((40, "Statement Period 07/01/25 TO 07/31/25"))
+    doc.line((40, "DEPOSIT ACCOUNT SUMMARY"), bold=True)
+    doc.skip()
+    truth = []
+
+    def section(title, credit, until):
+        def heading():
+            doc.line((40, title), bold=True)
+            doc.line((40, "Date"), (90, "Amount"), (170, "Description"))
+        heading()
+        doc.continued = heading
+        while doc.progress() < until and not doc.full(21):  # room for the Daily Balance Summary
+            day = _day(doc.progress())
+            amt = _amount(rng, 5, 9000)
+            head = rng.choice(_BMO_CREDITS if credit else _BMO_DEBITS)
+            detail = rng.choice(_BMO_DETAILS) if rng.random() < 0.5 else ""
+            doc.keep_together(2 if detail else 1)
+            doc.line((40, day.strftime("%b %d")), (90, _money(amt)), (170, head))
+            if detail:
+                doc.line((170, detail))
+            truth.append(_truth(day, f"{head} {detail}".strip(), credit=amt if credit else None,
+                                debit=None if credit else amt))
+        doc.continued = None
+        doc.skip()
+
+    section("Deposits and Other Credits", True, 0.45)
+    section("Withdrawals and Other Debits", False, 1.0)
+
+    def balances_heading():
+        doc.line((40, "Daily Balance Summary"), bold=True)
+        doc.line((40, "Date"), (90, "Balance"), (200, "Date"), (250, "Balance"))
+    balances_heading()
+    doc.continued = balances_heading
+    balance = _amount(rng, 2000, 9000)
+    for start in range(0, PERIOD_DAYS, 2):
+        if doc.full(1):
+            break
+        cells = []
+        for col, i in enumerate(range(start, min(start + 2, PERIOD_DAYS))):
+            day = PERIOD_START + timedelta(days=i)
+            balance = _amount(rng, 2000, 9000)
+            cells += [(40 + 160 * col, day.strftime("%b %d")), (90 + 160 * col, _money(balance))]
+            truth.append(_truth(day, "Daily Balance", balance=balance))
+        doc.line(*cells)
+    return doc, truth
+
+
+def _tpl_bmo_new(rng, pages):
+    """BMO Business Checking (Monthly Activity Details): column table, header on its first page only."""
+    account = _ref(rng, 10)
+    doc = PageLayout(pages, footer=_page_of(150, prefix=""))
+    doc.line((40, "BMO"), bold=True)
+    doc.line((40, "Business Checking Statement"), (300, f"Account # {account}"))
+    doc.line((40, "July 1, 2025 - July 31, 2025"))
+    doc.skip()
+    doc.line((40, "Monthly Activity Details"), bold=True)
+    doc.line((40, "Date"), (100, "Transaction description"), (320, "Withdrawal"), (410, "Deposit"),
+             (490, "Balance"), bold=True)
+    doc.continued = lambda: doc.line((40, f"Business Checking {account}"), (300, "Monthly Activity Details"))
+    balance = _amount(rng, 2000, 20000)
+    doc.line((100, "BEGINNING BALANCE"), (490, _money(balance, dollar=True)))
+    truth = [_truth(None, "BEGINNING BALANCE", balance=balance)]
+    while not doc.full(8):
+        # one day's rows; the balance is printed on its last row
+        day = _day(doc.progress())
+        n = rng.randint(1, 4)
+        for i in range(n):
+            credit = rng.random() < 0.35
+            amt = _amount(rng, 5, 6000)
+            balance += amt if credit else -amt
+            parts = [rng.choice(_BMO_CREDITS if credit else _BMO_DEBITS)]
+            if rng.random() < 0.6:
+                parts.append(rng.choice(_BMO_DETAILS))
+            last = i == n - 1
+            doc.keep_together(len(parts))
+            doc.line((40, day.strftime("%b %d")), (100, parts[0]),
+                     (410 if credit else 320, _money(amt if credit else -amt, dollar=True)),
+                     (490, _money(balance, dollar=True) if last else ""))
+            for part in parts[1:]:
+                doc.line((100, part))
+            truth.append(_truth(day, " ".join(parts), credit=amt if credit else None,
+                                debit=None if credit else amt, balance=balance if last else None))
+    doc.continued = None
+    doc.line((100, "ENDING BALANCE"), (490, _money(balance, dollar=True)))
+    truth.append(_truth(None, "ENDING BALANCE", balance=balance))
+    return doc, truth
+
+
+def _tpl_bmo_creditcard(rng, pages):
+    """BMO Business Platinum Credit Card: description+amount line, then the transaction date line."""
+    doc = PageLayout(pages, footer=_page_of(480))
+    doc.line((40, "BMO"), bold=True)
+    doc.line((40, "Business Platinum Credit Card"), bold=True)
+    doc.line((40, "Statement Period July 1 to July 31"))
+    doc.skip()
+    doc.line((40, "Transactions"), bold=True)
+    doc.line((40, "Description"), (480, "Amount"))
+    doc.continued = lambda: doc.line((40, "Transactions (continued)"), bold=True)
+    truth = []
+    while not doc.full(3):
+        day = _day(doc.progress())
+        if rng.random() < 0.05:
+            desc, amt = "PAYMENT RECEIVED THANK YOU", -_amount(rng, 500, 5000)
+        else:
+            desc, amt = rng.choice(_MERCHANTS).upper(), _amount(rng, 3, 1500)
+        doc.keep_together(2)
+        doc.line((40, desc), (480, _money(amt)))
+        doc.line((40, day.strftime("%b %d, %Y")))
+        truth.append(_truth(day, desc, credit=-amt if amt < 0 else None, debit=amt if amt > 0 else None))
+    return doc, truth
+
+
+TEMPLATES = {
+    "wf_optimize": _tpl_wf_optimize,
+    "wf_combined": _tpl_wf_combined,
+    "wf_business_card": _tpl_wf_business_card,
+    "bmo_old": _tpl_bmo_old,
+    "bmo_new": _tpl_bmo_new,
+    "bmo_creditcard": _tpl_bmo_creditcard,
+    "bofa": _tpl_bofa,
+    "chase_credit": _tpl_chase_credit,
+}
+
+
+def generate_statement(layout, pages=10, seed=0):
+    """Return (pdf bytes, ground-truth rows, pages drawn) for one synthetic statement."""
+    if layout not in TEMPLATES:
+        raise ValueError(f"no synthetic template for layout {layout!r} (have: {', '.join(TEMPLATES)})")
+    doc, truth = TEMPLATES[layout](random.Random(f"{layout}:{pages}:{seed}"), pages)
+    return doc.to_pdf(), truth, doc.pages_used
+
+
+def write_statement(layout, out_dir, pages=10, seed=0):
+    """Write <layout>_<pages>p.pdf and its .truth.csv into out_dir; returns (pdf path, truth rows)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data, truth, _ = generate_statement(layout, pages, seed)
+    pdf_path = out_dir / f"{layout}_{pages}p.pdf"
+    pdf_path.write_bytes(data)
+    pd.DataFrame(truth, columns=TRUTH_COLUMNS).to_csv(pdf_path.with_suffix(".truth.csv"), index=False)
+    return pdf_path, truth
+
+
+def write_fixture(layout, out_dir, pages=FIXTURE_PAGES, seed=0):
+    """
+    Record a generated statement as out_dir/synthetic_<layout>.fixture.json.gz for
+    bankDetailsExtract --check-fixtures; returns (fixture path, compare_rows() of
+    the recorded rows against the truth).
+    """
+    data, truth, _ = generate_statement(layout, pages, seed)
+    path = Path(out_dir) / f"synthetic_{layout}{bde.FIXTURE_SUFFIX}"
+    bde.record_fixture(data, path)
+    return path, compare_rows(bde.load_fixture(path).expected.get("rows") or [], truth)
+
+
+# ==================================================
+# Ground-truth comparison
+# ==================================================
+def _norm_desc(s):
+    return " ".join(str(s or "").split()).upper()
+
+
+def _norm_money(v):
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    try:
+        return round(abs(float(v)), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_key(row):
+    amount = _norm_money(row.get("debit"))
+    if amount is None:
+        amount = _norm_money(row.get("credit"))
+    return amount, _norm_money(row.get("balance"))
+
+
+def compare_rows(parsed, truth):
+    """
+    Match parsed rows to ground truth on amount, balance and description.
+    Amounts are compared unsigned (the parsers disagree on sign conventions) and
+    a parsed description only has to start with the true one, since the text
+    parsers append page furniture to the last row before a page break.
+    Dates are not compared: parsers return them as text, date objects or None.
+    """
+    if isinstance(parsed, pd.DataFrame):
+        parsed = parsed.to_dict("records")
+    available = {}
+    for row in parsed:
+        available.setdefault(_row_key(row), []).append(_norm_desc(row.get("description")))
+    matched = 0
+    for row in truth:
+        candidates = available.get(_row_key(row), [])
+        want = _norm_desc(row["description"])
+        for i, desc in enumerate(candidates):
+            if desc.startswith(want):
+                del candidates[i]
+                matched += 1
+                break
+    n_parsed = len(parsed)
+    return {"truth_rows": len(truth), "parsed_rows": n_parsed, "matched": matched,
+            "recall": matched / len(truth) if truth else 1.0,
+            "precision": matched / n_parsed if n_parsed else 0.0}
+
+
+# ==================================================
+# Benchmark
+# ==================================================
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None
+
+
+def _bench_one(layout, pdf_path, truth_path, pipeline, low_memory, text_backend="auto"):
+    """Parse one synthetic statement (in a fresh process) and score it against its truth file."""
+    bde.setup_logging("WARNING")
+    bde.LOW_MEMORY = low_memory
+    bde.TEXT_BACKEND = text_backend
+    truth = pd.read_csv(truth_path, dtype={"account_number": str}).astype(object)
+    truth = truth.where(truth.notna(), None).to_dict("records")
+    rss_before = bde.current_rss_mb()
+    started = time.perf_counter()
+    if pipeline:
+        _bank, used, rows = bde.parse_statement_rows(Path(pdf_path))
+    else:
+        backend = bde.layout_text_backend(layout) if text_backend == "auto" else text_backend
+        doc = bde.open_document(Path(pdf_path), backend)
+        try:
+            used, rows = layout, bde.LAYOUT_PARSERS[layout](doc)
+        finally:
+            doc.close()
+    seconds = time.perf_counter() - started
+    result = compare_rows(list(rows) if not isinstance(rows, pd.DataFrame) else rows, truth)
+    result.update(parser=used, seconds=seconds, rss_before_mb=rss_before, peak_rss_mb=_peak_rss_mb())
+    return result
+
+
+def benchmark(layouts=None, sizes=None, work_dir=None, pipeline=False, low_memory=False, seed=0,
+              text_backend="auto"):
+    """
+    Generate each layout at each page count, parse it in a fresh worker process
+    (so peak RSS belongs to that one run) and return one row per run with
+    throughput, memory and agreement with the ground truth. `scaling` is the
+    seconds/page relative to the smallest size of the same layout; values past
+    SUPERLINEAR_RATIO are marked in `superlinear`.
+    """
+    layouts = layouts or LAYOUTS
+    sizes = sorted(sizes or BENCH_PAGES)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="synthetic_") as tmp:
+        work_dir = Path(work_dir or tmp)
+        for layout in layouts:
+            base = None
+            for pages in sizes:
+                pdf_path, _ = write_statement(layout, work_dir, pages, seed)
+                with ProcessPoolExecutor(max_workers=1) as ex:
+                    r = ex.submit(_bench_one, layout, str(pdf_path),
+                                  str(pdf_path.with_suffix(".truth.csv")), pipeline, low_memory,
+                                  text_backend).result()
+                n_pages = bde.probe_pdf(pdf_path)["pages"]
+                per_page = r["seconds"] / max(n_pages, 1)
+                base = base or per_page
+                r.update(layout=layout, pages=n_pages, size_kb=round(pdf_path.stat().st_size / 1024, 1),
+                         pages_per_sec=n_pages / r["seconds"] if r["seconds"] else None,
+                         rows_per_sec=r["parsed_rows"] / r["seconds"] if r["seconds"] else None,
+                         scaling=per_page / base if base else None)
+                r["superlinear"] = bool(r["scaling"] and r["scaling"] > SUPERLINEAR_RATIO)
+                print(f"{layout:>16} {n_pages:>5}p  {r['seconds']:7.2f}s  {r['pages_per_sec']:6.1f} pages/s  "
+                      f"recall {r['recall']:.1%}  peak {r['peak_rss_mb'] or 0:.0f} MB"
+                      f"{'  ⚠️ superlinear' if r['superlinear'] else ''}", flush=True)
+                results.append(r)
+    return pd.DataFrame(results, columns=[
+        "layout", "parser", "pages", "size_kb", "truth_rows", "parsed_rows", "matched", "recall",
+        "precision", "seconds", "pages_per_sec", "rows_per_sec", "rss_before_mb", "peak_rss_mb",
+        "scaling", "superlinear"])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Synthetic bank statements with ground truth, and a scaling benchmark")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write synthetic PDFs and their .truth.csv")
+    gen.add_argument("--layout", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    gen.add_argument("--pages", nargs="+", type=int, default=[10])
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--out", type=Path, default=Path("input") / "synthetic")
+
+    fix = sub.add_parser("fixtures", help="record generated statements as --check-fixtures fixtures")
+    fix.add_argument("--layout", nargs="+", choices=LAYOUTS, default=FIXTURE_LAYOUTS)
+    fix.add_argument("--pages", type=int, default=FIXTURE_PAGES)
+    fix.add_argument("--seed", type=int, default=0)
+    fix.add_argument("--out", type=Path, default=Path("fixtures"))
+
+    bench = sub.add_parser("bench", help="time and score the parsers on generated statements")
+    bench.add_argument("--layout", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    bench.add_argument("--pages", nargs="+", type=int, default=BENCH_PAGES)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--pipeline", action="store_true",
+                       help="run detection + fallback cascade (parse_statement_rows) instead of the layout's parser")
+    bench.add_argument("--low-memory", action="store_true",
+                       help="parse with bankDetailsExtract's --low-memory mode (needed for 1,000 pages on small hosts)")
+    bench.add_argument("--text-backend", choices=["auto"] + sorted(bde.TEXT_BACKENDS), default=bde.TEXT_BACKEND,
+                       help="page text engine to parse with (bankDetailsExtract --text-backend)")
+    bench.add_argument("--keep", type=Path, metavar="DIR", help="keep the generated PDFs in DIR")
+    bench.add_argument("--csv", type=Path, help="also write the results to CSV")
+    args = ap.parse_args(argv)
+
+    if args.command == "generate":
+        for layout in args.layout:
+            for pages in args.pages:
+                pdf_path, truth = write_statement(layout, args.out, pages, args.seed)
+                print(f"✅ Saved: {pdf_path} ({len(truth)} rows)")
+        return 0
+
+    if args.command == "fixtures":
+        # a fixture pins whatever the parser gives today, so only record it if that is the truth
+        missed = 0
+        for layout in args.layout:
+            path, score = write_fixture(layout, args.out, args.pages, args.seed)
+            if score["matched"] == score["truth_rows"] == score["parsed_rows"]:
+                print(f"✅ Saved: {path} ({score['parsed_rows']} rows)")
+            else:
+                path.unlink()
+                missed += 1
+                print(f"❌ {layout}: parsed {score['parsed_rows']} rows, {score['matched']} of "
+                      f"{score['truth_rows']} true ones; not recorded")
+        return 1 if missed else 0
+
+    results = benchmark(args.layout, args.pages, args.keep, args.pipeline, args.low_memory, args.seed,
+                        args.text_backend)
+    if args.csv:
+        results.to_csv(args.csv, index=False)
+        print(f"✅ Saved: {args.csv}")
+    flagged = results[results["superlinear"]]
+    if len(flagged):
+        print(f"\n⚠️ superlinear: {', '.join(sorted(set(flagged['layout'])))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())